@@ -5,6 +5,7 @@ import os
 import pathlib
 import sys
 import tempfile
+import types
 from typing import Optional, Dict, Any, Union
 
 import torch.jit
@@ -121,8 +122,7 @@ class StringScriptContext():
         execution_globals = self.globals.copy()
         execution_locals = self.locals.copy()
 
-        source = open(module.__file__).read()
-        code = compile(source, filename=module.__file__, mode="exec")
+        code = self.get_code(module.__file__)
         exec(code, execution_globals, execution_locals)
 
         novel_globals = {key : value for key, value in execution_globals.items()
@@ -137,6 +137,30 @@ class StringScriptContext():
             setattr(module, key, value)
         return module
 
+    def get_code(self, path: str)->types.CodeType:
+        """
+        NOT USER SERVICEABLE
+
+        Gets the code object for the source file
+        at path.
+
+        The file is never read back. Its contents are
+        still in memory, and the path is only needed so
+        inspect and tracebacks can find the source.
+        """
+        return compile(self._file_source, filename=path, mode="exec")
+
+    def release_file(self):
+        """
+        NOT USER SERVICEABLE
+
+        Removes the file backing the open context, if any.
+        """
+        if self._file is not None:
+            os.remove(self._file)
+        self._file = None
+        self._file_source = None
+
     def get_handle(self)-> io.TextIOWrapper:
         """
         Gets a temporary file handle.
@@ -154,6 +178,7 @@ class StringScriptContext():
                 handle = _handle
             else:
                 _handle.close()
+                os.remove(path)
         return handle
     def get(self, name: str)->Union[torch.jit.ScriptModule, torch.jit.ScriptFunction]:
         """
@@ -199,6 +224,9 @@ class StringScriptContext():
         self.name = None
         self.module = None
 
+        self._file = None
+        self._file_source = None
+
     def __enter__(self):
         """
 
@@ -216,19 +244,21 @@ class StringScriptContext():
         #into it, create a temporary module backed by the file,
         #and execute everything, transferring it onto the module
         #
-        #
-
-
+        #The file lives until the context exits cleanly, and is
+        #removed then. The source written is kept in memory, so
+        #it is compiled without reading the file back.
 
         #Write to the temporary, then close it. It will not delete.
         handle = self.get_handle()
-        path = handle.name
         handle.write(self.source)
         handle.close()
+        self._file = handle.name
+        self._file_source = self.source
+        path = self._file
 
         #Form module
         name = pathlib.Path(path).stem
-        spec = importlib.util.spec_from_file_location(name, handle.name)
+        spec = importlib.util.spec_from_file_location(name, path)
         module = importlib.util.module_from_spec(spec)
         sys.modules[module.__name__] = module #This line is required for inspect to work
 
@@ -242,7 +272,11 @@ class StringScriptContext():
         #TODO: Add some decent error handling.
         sys.modules.pop(self.name)
         if exc_val is None:
-            os.remove(self.path)
+            self.release_file()
+        else:
+            #Leave the file behind for the traceback.
+            self._file = None
+            self._file_source = None
         self.path = None
         self.name = None
 
@@ -23,7 +23,7 @@ The environmental wrapper is declared on site, whereas the instance and class fe
 
 Torchscript will compile this.
 """
-from typing import List, Tuple, Set, Union, Any, Generator
+from typing import List, Tuple, Set, Union, Any, Generator, NamedTuple
 
 import torch
 import re
@@ -87,8 +87,11 @@ class Template():
         alias_dependencies: List[str] = dataclasses.field(default_factory = lambda : [])
         direct_dependencies: List[str] = dataclasses.field(default_factory = lambda : [])
         list_dependencies: List[Tuple[str, str]] = dataclasses.field(default_factory= lambda : [])
-    @dataclasses.dataclass
-    class dependencyStub:
+    class dependencyStub(NamedTuple):
+        """
+        One dependency found in a template. Made once per
+        format block, so kept as a lightweight tuple.
+        """
         name: str
         join_str: str = ""
         is_alias: bool = False
@@ -101,30 +104,44 @@ class Template():
     def get_format_names(template: str)->List[str]:
         """Gets format names out of strings. Respects balancing"""
         #Does a depth based analysis to find balanced top level {} blocks.
+        #
+        #The next open and close positions are held between steps, and
+        #only the one which was just consumed is searched for again. This
+        #keeps the scan to a single str.find per brace.
+        #
+        #Outside a block, '{{' and '}}' are escapes, as in str.format,
+        #and are skipped. Inside one, braces nest format specs.
         #Todo: Handle edge cases
         depth = 0
         start = 0
-        position = 0
         outputs: List[str] = []
+        next_open_index = template.find("{")
+        next_close_index = template.find("}")
         while True:
-            next_open_index = template.find("{", position)
-            next_close_index = template.find("}", position)
-            if next_close_index == -1:
-                # Done with iteration
-                break
-            position = next_open_index if next_open_index < next_close_index \
-                                          and next_open_index != -1 else next_close_index
-            if position == next_open_index:
+            if next_open_index != -1 and (next_close_index == -1 or next_open_index < next_close_index):
+                if depth == 0 and template.startswith("{{", next_open_index):
+                    next_open_index = template.find("{", next_open_index + 2)
+                    continue
                 if depth == 0:
-                    start = position
+                    start = next_open_index
                 depth += 1
-            else:
-                depth -= 1
-
-            position += 1
+                next_open_index = template.find("{", next_open_index + 1)
+                continue
+            if next_close_index == -1:
+                # Done with iteration. Anything still open is unmatched.
+                if depth > 0:
+                    raise RuntimeError("Unmatched '{' at position %s" % start)
+                break
             if depth == 0:
-                stringslice = template[start + 1:position - 1]
+                if template.startswith("}}", next_close_index):
+                    next_close_index = template.find("}", next_close_index + 2)
+                    continue
+                raise RuntimeError("Unmatched '}' at position %s" % next_close_index)
+            depth -= 1
+            if depth == 0:
+                stringslice = template[start + 1:next_close_index]
                 outputs.append(stringslice)
+            next_close_index = template.find("}", next_close_index + 1)
         return outputs
     def is_predefined_attribute(self, attribute_name: str):
         """
@@ -193,50 +210,40 @@ class Template():
             stub = self.CompileStub(template,subtemplate_dependencies, direct_dependencies, list_dependencies)
             dependencies[name] = stub
         self.compile_info = dependencies
-    def dependencies_satisfied(self, dependencies: "Template.CompileStub", compiled_names: List[str])->bool:
-        """Checks if all the listed dependencies are either attributes or in compiled name"""
-        for dependency in dependencies:
-            if dependency in compiled_names:
-                continue
-            if hasattr(self, dependency):
-                if getattr(self, dependency) is None:
-                    raise AttributeError("Attribute of name %s never set on template" % dependency)
-                continue
-            return False
-        return True
-    def get_dependencies(self, dependencies: Set[str], compiled_subtemplates: Dict[str, str])->Dict[str, str]:
-        """Gets the dependencies, out of either the compiled subtemplate or the class attributes"""
-        output_dictionary = {}
-        for dependency in dependencies:
-            if dependency in compiled_subtemplates:
-                output_dictionary[dependency] = compiled_subtemplates[dependency]
+    class LazyResolver(dict):
+        """
+        A formatting mapping which resolves names only once
+        format_map asks for them. Subtemplates are compiled on
+        first use and kept, while anything else is fetched from
+        the template attributes.
+        """
+        def __missing__(self, name: str)->str:
+            if name in self.template.compile_info:
+                if name in self.in_progress:
+                    raise RuntimeError("Recursive or invalid template")
+                self.in_progress.add(name)
+                stub = self.template.compile_info[name]
+                value = stub.template.format_map(self)
+                self.in_progress.discard(name)
+            elif hasattr(self.template, name):
+                value = getattr(self.template, name)
+                if value is None:
+                    raise AttributeError("Attribute of name %s never set on template" % name)
             else:
-                output_dictionary[dependency] = getattr(self, dependency)
-        return output_dictionary
+                raise KeyError(name)
+            self[name] = value
+            return value
+        def __init__(self, template: "Template"):
+            super().__init__()
+            self.template = template
+            self.in_progress: Set[str] = set()
     def __call__(self)->str:
         """Yields a compiled template"""
-        # A quick and dirty template compiler capable of ensuring that the template is filled
-        # properly. Goes through list of templates and required_dependencies, and tracks down, then executes,
-        # anything which is compilable but has not been compiled. aliases are filled in as we go.
-        # Catches and raises if it gets stuck. Not particularly efficient, but does it really need to be
-        # so?
-
-        compiled_subtemplates = {}
-        compilation_targets = self.compile_info.copy()
-        while True:
-            progressing = False
-            for name in compilation_targets:
-                if self.dependencies_satisfied(compilation_targets[name]):
-                    progressing = True
-                    stub = compilation_targets.pop(name)
-                    dependencies = self.get_dependencies(stub, compiled_subtemplates)
-                    if name == self.template_name:
-                        return stub.template.format(**dependencies)
-                    else:
-                        compiled_subtemplates[name] = stub.template.format(**dependencies)
-                    break
-            if not progressing:
-                raise RuntimeError("Recursive or invalid template")
+        # The template is handed to str.format_map along with a lazy
+        # resolver. Names are thus looked up, and subtemplates compiled,
+        # only as the formatting walk reaches them. Catches and raises if
+        # a subtemplate ends up requiring itself.
+        return self.LazyResolver(self)[self.template_name]
 
 class dev_template(Template):
     template = """
@@ -245,5 +252,6 @@ class dev_template(Template):
     """
 
 
-instance = dev_template()
-instance()
+if __name__ == "__main__":
+    instance = dev_template()
+    instance()
@@ -64,6 +64,19 @@ class DoubleLinkedList():
     # unit tests can be performed on it with
     # ease
     #
+    __slots__ = ("_child", "_parent")
+    @classmethod
+    def chain(cls, n: int) -> List["DoubleLinkedList"]:
+        """
+        Creates n nodes already linked, in order, into a
+        single list. The links are stored directly, skipping
+        the unlinking bookkeeping the setters perform.
+        """
+        nodes = [cls() for _ in range(n)]
+        for i, node in enumerate(nodes):
+            node._parent = nodes[i-1] if i > 0 else None
+            node._child = nodes[i+1] if i < n-1 else None
+        return nodes
     @property
     def child(self) -> Optional["BuildNode"]:
         return self._child
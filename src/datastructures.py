@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, List
 
 from src import errors
 from src import rcb
@@ -98,6 +98,41 @@ class CodeBlock(DLList):
         msg = "Error encountered while preprocessing. Context Unknown"
         output = errors.UnhandledPreprocessingError(trace, msg)
         return output
+    def fetch_exceptions_batch(self, trace: Any, ranges: List[errors.SourceRange])-> List[errors.Types]:
+        """
+        Fetches the exceptions belonging to many regions of the source at once.
+
+        Gives the same results as calling fetch_exception on each range,
+        but the linked list is walked only once, and the ranges are swept
+        in order of where they start.
+        """
+        #The block boundaries are gathered in a single pass, as
+        #start and end each walk back to the head of the list.
+        bounds = []
+        position = self.start
+        for block in self:
+            bounds.append((position, position + len(block.code), block))
+            position += len(block.code)
+
+        output: List[Optional[errors.Types]] = [None]*len(ranges)
+        order = sorted(range(len(ranges)), key=lambda i: ranges[i].start)
+        index = 0
+        for i in order:
+            r = ranges[i]
+            #A block ending before this range starts cannot hold it, nor any later range.
+            while index < len(bounds) and bounds[index][1] < r.start:
+                index += 1
+            candidate = index
+            while candidate < len(bounds) and bounds[candidate][0] <= r.start:
+                start, end, block = bounds[candidate]
+                if end >= r.end:
+                    output[i] = block.exception(trace)
+                    break
+                candidate += 1
+            if output[i] is None:
+                msg = "Error encountered while preprocessing. Context Unknown"
+                output[i] = errors.UnhandledPreprocessingError(trace, msg)
+        return output
     def read(self)->str:
         """Read out contents of the linked list as a singular string"""
         if self.next is None:
@@ -11,8 +11,9 @@ elsewhere in our particular environment
 
 """
 import builtins
-import inspect
-from typing import Dict, Any, Callable
+import collections
+import sys
+from typing import Dict, Any, Callable, MutableMapping
 from torch import _jit_internal
 
 class EnvProxy(object):
@@ -25,27 +26,33 @@ class EnvProxy(object):
     in its scripting process.
     """
     def __init__(self,
-                 f_locals: Dict[str, Any],
-                 f_globals: Dict[str, Any],
-                 f_builtins: Dict[str, Any]):
+                 f_locals: MutableMapping[str, Any],
+                 f_globals: MutableMapping[str, Any],
+                 f_builtins: MutableMapping[str, Any]):
         self.locals = f_locals.copy()
         self.globals = f_globals.copy()
         self.builtins = f_builtins.copy()
     def as_dict(self)->Dict[str, Any]:
-        output = {}
-        output.update(self.builtins)
-        output.update(self.globals)
-        output.update(self.locals)
-        return output
+        return {**self.builtins, **self.globals, **self.locals}
     def __getattr__(self, key):
         if key in self.locals:
             return self.locals[key]
         elif key in self.globals:
             return self.globals[key]
-        elif key in dir(self.builtins):
-            return getattr(self.builtins, key)
+        elif key in self.builtins:
+            return self.builtins[key]
     def __copy__(self):
-        return EnvProxy(self.locals.copy(), self.globals.copy(), self.builtins.copy())
+        #Rather than copying every mapping outright, both this
+        #proxy and the copy are given a fresh, empty layer over
+        #the mappings held so far. Writes land in each side's own
+        #layer, so neither sees the other's edits, and the shared
+        #mappings underneath are never written to again.
+        duplicate = EnvProxy.__new__(EnvProxy)
+        for name in ("locals", "globals", "builtins"):
+            shared = getattr(self, name)
+            setattr(self, name, collections.ChainMap({}, shared))
+            setattr(duplicate, name, collections.ChainMap({}, shared))
+        return duplicate
     def copy(self):
         return self.__copy__()
 def makeEnvFromFrame(frames_up: int = 0)-> EnvProxy:
@@ -57,17 +64,11 @@ def makeEnvFromFrame(frames_up: int = 0)-> EnvProxy:
     :param frames_up: How many frames to ascend before making
     :return: A EnvProxy object
     """
-    frame = inspect.currentframe()
-    i = 0
-    while i < frames_up + 1:
-        assert frame is not None
-        frame = frame.f_back
-        i += 1
-
-    assert frame is not None
+    #The frame is fetched directly rather than walked to one f_back at a time.
+    frame = sys._getframe(frames_up + 1)
     f_locals = frame.f_locals
     f_globals = frame.f_globals
-    f_builtins = {key : getattr(builtins, key) for key in dir(builtins)}
+    f_builtins = vars(builtins)
     return EnvProxy(f_locals, f_globals, f_builtins)
 
 def createCallbackfromEnv(env: EnvProxy)->Callable[[str], Any]:
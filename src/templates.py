@@ -1,9 +1,9 @@
 import collections
 import dataclasses
 import enum
+import functools
 import regex
 import textwrap
-import pyparsing as pp
 from typing import List, Tuple, Dict, Union, Optional, Callable, Any
 
 
@@ -138,6 +138,18 @@ class Keyword_Alias:
     they will be strings, nothing else.
     """
     alias_indicators = ("<$$", "$$>")
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def compile_alias_pattern(alias_indicators: Tuple[str, str], magic_word: str)->regex.Pattern:
+        """
+        Compiles a pattern matching any alias token of a magic word.
+
+        :param alias_indicators: The open and close alias delimiters
+        :param magic_word: The magic word the aliases were claimed under
+        :return: The compiled pattern. Cached, keyed on the arguments
+        """
+        open_delimitor, close_delimiter = alias_indicators
+        return regex.compile(regex.escape(open_delimitor + magic_word) + r"\d+" + regex.escape(close_delimiter))
     @classmethod
     def claim_alias(cls, context: Context, magic_word: str)->Tuple[Context, "Keyword_Alias"]:
         """
@@ -151,13 +163,15 @@ class Keyword_Alias:
         updated_keywords = {}
         alias_mappings = {}
         open_delimitor, close_delimiter = cls.alias_indicators
+        prefix = open_delimitor + magic_word
         for i, (key, value) in enumerate(original_keywords.items()):
-            alias_value = open_delimitor + magic_word + str(i) + close_delimiter
+            alias_value = prefix + str(i) + close_delimiter
             updated_keywords[key] = alias_value
             alias_mappings[alias_value] = value
 
         updated_context = context.derive_from_keywords(updated_keywords)
-        keyword_alias = cls(updated_keywords, alias_mappings)
+        alias_pattern = cls.compile_alias_pattern(cls.alias_indicators, magic_word)
+        keyword_alias = cls(updated_keywords, alias_mappings, alias_pattern)
         return updated_context, keyword_alias
     def find_aliases_in_string(self, string: str)->List[str]:
         """
@@ -170,14 +184,10 @@ class Keyword_Alias:
         :return: A list of dectected aliases
         """
 
-
-        output = []
-        lookup_dict = dict(zip(self.keyword_updates.values(), self.keyword_updates.keys()))
-        for key in self.aliasing.keys():
-            if key in string:
-                original_keyword = lookup_dict[key]
-                output.append(original_keyword)
-        return output
+        #A single scan collects the alias tokens present. They are
+        #then reported in keyword order, once each.
+        found = set(self.alias_pattern.findall(string))
+        return [key for key, alias in self.keyword_updates.items() if alias in found]
 
     def substitute(self, string: str, keywords: Optional[Dict[str, str]]=None)->str:
         """
@@ -192,16 +202,61 @@ class Keyword_Alias:
         :return: A restored string
         """
 
-        updates = {self.keyword_updates[key] : value for key, value in keywords.items()}
-        restoration = self.aliasing.copy()
-        restoration.update(updates)
-        for key, value in restoration.items():
-            string = string.replace(key, value)
-        return string
+        restoration = self.aliasing
+        if keywords:
+            restoration = restoration.copy()
+            restoration.update((self.keyword_updates[key], value) for key, value in keywords.items())
+
+        #Every alias is replaced in one pass. Tokens which are not
+        #ours are left alone.
+        def restore(match: regex.Match)->str:
+            alias = match.group()
+            return restoration.get(alias, alias)
+        return self.alias_pattern.sub(restore, string)
+
+    def compile_substitution(self, string: str)->Callable[[Optional[Dict[str, str]]], str]:
+        """
+        Prepares string for repeated substitution.
+
+        The string is scanned for aliases once. The returned
+        function behaves as substitute does on string, but
+        only joins the literal sections with the values.
+
+        :param string: The string which will be substituted into
+        :return: A function accepting keywords, and returning the restored string
+        """
+        lookup_dict = dict(zip(self.keyword_updates.values(), self.keyword_updates.keys()))
+        literals: List[str] = []
+        slots: List[Tuple[Optional[str], Any]] = []
+        position = 0
+        for match in self.alias_pattern.finditer(string):
+            alias = match.group()
+            literals.append(string[position:match.start()])
+            slots.append((lookup_dict.get(alias), self.aliasing.get(alias, alias)))
+            position = match.end()
+        tail = string[position:]
+
+        def substitute(keywords: Optional[Dict[str, str]] = None)->str:
+            if not keywords:
+                keywords = {}
+            pieces = []
+            for literal, (key, default) in zip(literals, slots):
+                pieces.append(literal)
+                pieces.append(keywords.get(key, default))
+            pieces.append(tail)
+            return "".join(pieces)
+        return substitute
 
-    def __init__(self, updated_keywords: Dict[str, str], alias_mappings: Dict[str, Any]):
+    def __init__(self,
+                 updated_keywords: Dict[str, str],
+                 alias_mappings: Dict[str, Any],
+                 alias_pattern: Optional[regex.Pattern] = None):
         self.keyword_updates = updated_keywords
         self.aliasing = alias_mappings
+        if alias_pattern is None:
+            #No magic word is known. Match the aliases themselves.
+            alias_pattern = regex.compile("|".join(regex.escape(alias) for alias in alias_mappings) or "(?!)")
+        self.alias_pattern = alias_pattern
 
 class Directive():
     """
@@ -275,37 +330,73 @@ class Directive():
     subgroup_delimiter: str = "|=|"
     token_indicators: Tuple[str, str] = ("<####", "####>") #Found in return string
 
+    #The fixed front of every token, built once per class.
+    _token_prefix: str
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if hasattr(cls, "token_magic_word"):
+            cls._token_prefix = cls.token_indicators[0] + cls.token_magic_word
+
     #Class methods .Concerned primarily with creating and processing the
     #dataclass instances.
 
     @classmethod
-    def get_select_pattern(cls)->pp.ParserElement:
+    def get_select_pattern(cls)->regex.Pattern:
         """
-        A compiled parser pattern.
+        A compiled regex pattern.
 
         This pattern will match the syntax of an
-        embedded keyword or command for python.
+        embedded keyword or command for python. Each
+        None entry in the subgroup patterns becomes
+        a numbered capture group, in order.
+
+        Classes sharing the same syntax share the
+        same compiled pattern.
+        """
+        return cls.compile_select_pattern(tuple(cls.select_indicators),
+                                          cls.subgroup_delimiter,
+                                          tuple(cls.subgroup_patterns))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def compile_select_pattern(select_indicators: Tuple[str, str],
+                               subgroup_delimiter: str,
+                               subgroup_patterns: Tuple[Optional[str], ...])->regex.Pattern:
+        """
+        Compiles the select pattern for a particular directive syntax.
+
+        :param select_indicators: The open and close delimiters
+        :param subgroup_delimiter: The string seperating subgroups
+        :param subgroup_patterns: The subgroup grammer. None entries are captured
+        :return: The compiled pattern. Cached, keyed on the syntax
         """
         #This functions as follows.
         #
-        #First, we start up a pyparsing pattern
-        #on the open block. Then, for each
-        #subgrammer feature, we append it
-        #along with a suppressed join block.
+        #First, we start up a pattern on the open
+        #block. Then, for each subgrammer feature,
+        #we append it along with a join block.
+        #
+        #Whitespace is permitted in front of every
+        #element after the open block, and is not
+        #captured at the start of a group.
 
-        #Develop parsing literals for the delimiters
-        open_delimiter, close_delimiter = cls.select_indicators
-        open_delimiter = pp.Literal(open_delimiter)
-        close_delimiter = pp.Literal(close_delimiter)
-        subgroup_delimitor = pp.Literal(cls.subgroup_delimiter)
+        #Develop escaped literals for the delimiters
+        open_delimiter, close_delimiter = (regex.escape(item) for item in select_indicators)
+        subgroup_delimitor = regex.escape(subgroup_delimiter)
+        whitespace = r"[ \t\n\r]*"
 
         #Develop recursive ignore expression. This allows a nested
         #command, such as <!!Do something|=|<!!REPLICATEINDENT!!>!!>
-        #to parse by finding and ignoring balanced delimiters
+        #to parse by finding and ignoring balanced delimiters.
+        #
+        #skip_to consumes, without backtracking, everything up to
+        #the first unnested occurance of target. Balanced
+        #delimiters are consumed whole by the recursive "nest" group,
+        #which is defined once at the end of the pattern.
 
-        nested_skip = pp.Forward()
-        ignore_recursion = open_delimiter + pp.SkipTo(close_delimiter, ignore=nested_skip) + close_delimiter
-        nested_skip <<= ignore_recursion
+        def skip_to(target: str)->str:
+            return "(?>(?:(?&nest)|(?!%s).)*)" % target
+        nested_skip = "(?(DEFINE)(?P<nest>%s%s%s))" % (open_delimiter, skip_to(close_delimiter), close_delimiter)
 
         ## Compile the subgroups
         #
@@ -314,45 +405,50 @@ class Directive():
         # content ignoring balanced delimitators and skipping to the next
         # group delimitor. This captures everything in between
         #
-        # Meanwhile, if it is not none, we just ignore the word as part
+        # Meanwhile, if it is not none, we just match the word as part
         # of the command syntax, and thus uninteresting.
         #
         # We stop right before the last entry.
 
-        subgroups = cls.subgroup_patterns
+        subgroups = subgroup_patterns
         pattern = open_delimiter
         for i in range(len(subgroups)-1):
             grammer = subgroups[i]
             if grammer is None:
-                pattern = pattern + pp.SkipTo(subgroup_delimitor, ignore=ignore_recursion)
+                pattern = pattern + whitespace + "(" + skip_to(subgroup_delimitor) + ")"
             else:
-                pattern = pattern + pp.Suppress(pp.Literal(grammer))
-            pattern = pattern + pp.Suppress(subgroup_delimitor)
+                pattern = pattern + whitespace + regex.escape(grammer)
+            pattern = pattern + whitespace + subgroup_delimitor
         #We finish the compilation manually.
         #
         # If the last element is none, skip to the ending delimiter.
-        # Else, just capture and suppress that element.
+        # Else, just match that element.
 
         if subgroups[-1] is None:
-            pattern = pattern + pp.SkipTo(close_delimiter, ignore=ignore_recursion)
+            pattern = pattern + whitespace + "(" + skip_to(close_delimiter) + ")"
         else:
-            pattern = pattern + pp.Suppress(pp.Literal(subgroups[-1]))
-        pattern = pattern + close_delimiter
-        return pattern
+            pattern = pattern + whitespace + regex.escape(subgroups[-1])
+        pattern = pattern + whitespace + close_delimiter + nested_skip
+        return regex.compile(pattern, regex.DOTALL)
 
     @classmethod
     def string_has_match(cls, string: str)->bool:
         """ Checks if it is the case that a match currently exists in the given string"""
+        #Most strings do not use any particular directive. The open delimiter,
+        #and any keyword, must appear literally, which is far cheaper to
+        #rule out than a full scan. Whitespace may seperate the two, so
+        #they are checked for independently.
+        if cls.select_indicators[0] not in string:
+            return False
+        if any(grammer is not None and grammer not in string for grammer in cls.subgroup_patterns):
+            return False
         pattern = cls.get_select_pattern()
-        for match in pattern.scan_string(string):
-            return True
-        return False
+        return pattern.search(string) is not None
 
     @classmethod
     def get_token(cls, number)->str:
         """Get token representing 'number' entity"""
-        startwith, endwith = cls.token_indicators
-        return startwith + cls.token_magic_word + str(number)+ endwith
+        return cls._token_prefix + str(number) + cls.token_indicators[1]
 
 
     ### Useful functions. The following is designed to be utilized by the subclasses. ###
@@ -379,20 +475,27 @@ class Directive():
         if predicate is None:
             predicate = lambda x : True
 
+        #The escaped string is assembled in the same pass as
+        #the directives are found. Pieces are gathered and
+        #joined once, rather than growing a string.
         pattern = cls.get_select_pattern()
+        open_str, close_str = cls.select_indicators
         token_counter = 0
-        token_map: Dict[Tuple[int,int], str] = {}
         directives_dict: Dict[str, "Directive"] = {}
-        end_at = 0
-        for match in pattern.scan_string(string):
+        pieces = []
+        pos = 0
+        for match in pattern.finditer(string):
 
             #Get the required features.
             #
             # These are the open string, the close string,
             # the content string, the token, and the subgroups.
+            #
+            # The final regex group is the recursion definition,
+            # and is not a subgroup.
 
-            open_str, close_str = cls.select_indicators
-            subgroups, startat, endat = match
+            startat, endat = match.span()
+            subgroups = [open_str, *match.groups()[:-1], close_str]
             content_startat = startat + len(open_str)
             content_endat = endat -len(close_str)
             content = string[content_startat:content_endat]
@@ -407,25 +510,15 @@ class Directive():
                                   )
             if predicate(directive):
                 directives_dict[token] = directive
-                token_map[(startat, endat)] = token
                 token_counter += 1
 
+                #Cut out the directive, and insert the token
+                pieces.append(string[pos:startat])
+                pieces.append(token)
+                pos = endat
 
-
-        #Update the string. Insert the tokens
-        #by cutting out the relevant chunks
-        #as we go along.
-        original_string = string
-        output_string = ""
-        pos = 0
-        for (startat, endat), token in token_map.items():
-            unaltered_segment = original_string[pos:startat]
-            update = unaltered_segment + token
-            output_string += update
-            pos = endat
-        if pos < len(original_string):
-            unaltered_segment = original_string[pos:len(original_string)]
-            output_string += unaltered_segment
+        pieces.append(string[pos:])
+        output_string = "".join(pieces)
 
         return output_string, directives_dict
     @classmethod
@@ -541,6 +634,22 @@ class Lookup(NativeDirectiveParser):
     directive_type = "Keyword"
     token_magic_word = "KEYWORD"
     subgroup_patterns = (None,)
+    @staticmethod
+    def is_cyclic(context: Context, subtemplate: str)->bool:
+        """
+        Checks whether a subtemplate is already being resolved
+        further up the context chain. Entering it again would
+        never terminate.
+
+        :param context: The context the lookup is occurring in
+        :param subtemplate: The subtemplate about to be entered
+        :return: Whether the lookup would cycle
+        """
+        while context is not None:
+            if context.source_string is subtemplate:
+                return True
+            context = context.parent
+        return False
     @classmethod
     def compile_directives(cls,
                context: Context,
@@ -551,6 +660,8 @@ class Lookup(NativeDirectiveParser):
         for token, directive in directives.items():
             if directive.content in context.templates:
                 subtemplate = context.templates[directive.content]
+                if cls.is_cyclic(context, subtemplate):
+                    raise SubtemplateCompileFailure(directive.content, subtemplate, directive.content)
                 subcontext = context.derive_from_template(subtemplate)
                 formatting[token] = parser(subcontext, subtemplate)
             elif directive.content in context.keywords:
@@ -638,26 +749,34 @@ class FormatMultifill(AdvancedDirectiveParser):
 
             #Having done standard parsing, go fetch lists and perform the multifill
 
-            list_keywords: Dict[str, List[str]] = {key : value for key, value in keywords.items() if isinstance(value, list)}
-            string_keywords: Dict[str, str] = {key : value for key, value in keywords.items() if isinstance(value, str)}
-
-            if len(list_keywords) > 0:
+            #The lists are kept as columns, and the string keywords are
+            #placed once into a row template which each instance copies. This
+            #avoids broadcasting every string into a list of its own.
+            list_keys: List[str] = []
+            list_cols: List[List[str]] = []
+            row: Dict[str, str] = {}
+            for key, value in keywords.items():
+                if isinstance(value, list):
+                    list_keys.append(key)
+                    list_cols.append(value)
+                elif isinstance(value, str):
+                    row[key] = value
+
+            if len(list_keys) > 0:
                 #Verify lengths are sane
-                standard_length = len(next(iter(list_keywords.values())))
-                if not all(len(l) == standard_length for l in list_keywords.values()):
+                standard_length = len(list_cols[0])
+                if not all(len(l) == standard_length for l in list_cols):
                     message = "Not all lists are of the same length"
                     raise IllegalDirective(message, directive)
 
-
-                #Broadcast string keywords into list keywords
-                #Create subcases for str.join.
-                list_keywords.update({key : [value]*standard_length for key, value in string_keywords.items()})
-
+                #Create subcases for str.join. The template is scanned
+                #for aliases once, and each instance only joins values.
+                substitute = alias.compile_substitution(template)
                 instances = []
-                for i in range(standard_length):
-                    subformatting = {key : value[i] for key, value in list_keywords.items()}
-                    instance = alias.substitute(template, subformatting)
-                    instances.append(instance)
+                for values in zip(*list_cols):
+                    subformatting = row.copy()
+                    subformatting.update(zip(list_keys, values))
+                    instances.append(substitute(subformatting))
 
                 #Join and store.
                 formatting[token] = join_str.join(instances)
@@ -753,6 +872,7 @@ class Resolver():
         return formatting
 
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def dedent(cls, string: str)->str:
         """
         A context aware dedent function, this will remove
@@ -760,6 +880,8 @@ class Resolver():
         string of text. It will ignore special characters that
         are defined within commands.
 
+        Template bodies are constant, so results are cached.
+
         :param string: The string to dedent
         :return: A dedented string
         """
@@ -780,12 +902,28 @@ class Resolver():
 
 
     @staticmethod
-    def format(formatting_dict: Dict[str, str], string: str)->str:
+    @functools.lru_cache(maxsize=256)
+    def compile_format_pattern(keys: Tuple[str, ...])->regex.Pattern:
+        """
+        Compiles a pattern matching any of the given keys.
+
+        Longer keys are tried first, so no key can be cut short
+        by another which is its prefix.
+
+        :param keys: The keys to match
+        :return: The compiled pattern. Cached, keyed on the keys
+        """
+        ordered = sorted(keys, key=len, reverse=True)
+        return regex.compile("|".join(regex.escape(key) for key in ordered))
+    @classmethod
+    def format(cls, formatting_dict: Dict[str, str], string: str)->str:
         """Performs replacement of items given by the formatting dict
         with their corresponding value"""
-        for key, value in formatting_dict.items():
-            string = string.replace(key, value)
-        return string
+        #All keys are replaced in a single scan of the string.
+        if len(formatting_dict) == 0:
+            return string
+        pattern = cls.compile_format_pattern(tuple(formatting_dict))
+        return pattern.sub(lambda match: formatting_dict[match.group()], string)
     @classmethod
     def parse(cls, context: Context, string: str,)->str:
         """
@@ -844,6 +982,63 @@ class Template():
     """
 
 
+    _specializations: Dict[str, Optional[Callable[[Dict[str, str]], str]]] = {}
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._specializations = {}
+
+    @classmethod
+    def specialize(cls, name: str)->Optional[Callable[[Dict[str, str]], str]]:
+        """
+        Compiles the named template down to a plain python
+        function, if possible. This works when the template is
+        made of nothing but keyword lookups, in which case
+        rendering is a single join of literals and keywords.
+
+        Anything containing other directives, or looking up a
+        subtemplate, must go through the resolver instead.
+        Results are cached per class.
+
+        The function returns None instead when a keyword
+        it needs is missing or not a string, so those cases
+        can be left for the resolver to report.
+
+        :param name: The template to specialize
+        :return: A function accepting keywords and returning the string, or None
+        """
+        if name in cls._specializations:
+            return cls._specializations[name]
+
+        template = getattr(cls, name)
+        renderer = None
+        if not any(DirectiveParser.string_has_match(template)
+                   for DirectiveParser in Resolver.resolution_sequence
+                   if DirectiveParser is not Lookup):
+            output_string, directives = Lookup.get_directives(template)
+            if not any(isinstance(getattr(cls, directive.content, None), str)
+                       for directive in directives.values()):
+                #Emit a function which checks the keywords, then joins
+                #the literal sections with them, and execute it.
+                pieces = []
+                pos = 0
+                for token, directive in directives.items():
+                    start = output_string.index(token, pos)
+                    pieces.append(repr(output_string[pos:start]))
+                    pieces.append("keywords[%s]" % repr(directive.content))
+                    pos = start + len(token)
+                pieces.append(repr(output_string[pos:]))
+                source = ("def render(keywords):\n"
+                          "    for key in required:\n"
+                          "        if not isinstance(keywords.get(key), str):\n"
+                          "            return None\n"
+                          "    return ''.join((%s,))\n" % ", ".join(pieces))
+                required = tuple(dict.fromkeys(directive.content for directive in directives.values()))
+                namespace = {"required" : required}
+                exec(compile(source, "<template %s.%s>" % (cls.__name__, name), "exec"), namespace)
+                renderer = namespace["render"]
+        cls._specializations[name] = renderer
+        return renderer
+
     def __contains__(self, key: str)->bool:
         """Checks if we contain the indicated feature. Makes template behave something like a list"""
         if not hasattr(self, key):
@@ -867,8 +1062,15 @@ class Template():
         if name not in self:
             raise AttributeError("No template of name %s found among attributes" %name)
         self.__PrimaryTemplate = self[name]
+        self.__Specialized = self.specialize(name)
     def __call__(self, keywords: Dict[str, str])->str:
         """Uses keywords to compile the given template, recursively"""
+        if self.__Specialized is not None:
+            #Missing or non-string keywords are left for
+            #the resolver to report.
+            output = self.__Specialized(keywords)
+            if output is not None:
+                return output
         primary = self.__PrimaryTemplate
         context = Context(keywords, self, primary)
         return Resolver.parse(context, primary)
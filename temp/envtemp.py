@@ -8,15 +8,12 @@ Just a proxy for the implimentation later.
 import builtins
 from typing import Dict, Any
 
+_BUILTINS = vars(builtins) #Builtins do not change at runtime. Look them up once.
 
 class EnvProxy(object):
     def formatted_dict(self)->Dict[str, Any]:
         """ Returns a dictionary representing the entire environment"""
-        output = {}
-        output.update(vars(builtins))
-        output.update(self.globals)
-        output.update(self.locals)
-        return output
+        return {**_BUILTINS, **self.globals, **self.locals}
     def __copy__(self):
         return EnvProxy(self.locals.copy(), self.globals.copy())
     def __getattr__(self, key):
@@ -24,8 +21,8 @@ class EnvProxy(object):
             return self.locals[key]
         elif key in self.globals:
             return self.globals[key]
-        elif key in dir(builtins):
-            return getattr(builtins, key)
+        elif key in _BUILTINS:
+            return _BUILTINS[key]
     def __init__(self,
                  f_locals: Dict[str, Any],
                  f_globals: Dict[str, Any]):
@@ -11,14 +11,19 @@ import unittest
 import inspect
 import textwrap
 import difflib
+import os
 
 
 
 def run_rewrite(item, recursive_depth: int = 5)->Type:
     raise NotImplementedError()
+_source_cache = {}
 def get_source(cls: Type)->str:
-    source = inspect.getsource(cls)
-    source = textwrap.dedent(source)
+    source = _source_cache.get(cls)
+    if source is None:
+        source = inspect.getsource(cls)
+        source = textwrap.dedent(source)
+        _source_cache[cls] = source
     return source
 
 
@@ -26,25 +31,99 @@ def get_source(cls: Type)->str:
 #
 
 
+### Inheritance fixtures ###
+#
+# The classes under test for testInheritanceStatic. They are
+# built once at import and shared, rather than redefined within
+# every test. Each holder keeps the original class names.
+
+class SingleInheritanceFixtures():
+    class Base:
+        def method_to_override(self) -> int:
+            return 3
+        def method_to_inherit(self) -> int:
+            return 4
+    class Inheritor(Base):
+        def method_to_override(self) -> int:
+            return 6
+        def __init__(self):
+            pass
+
+class ChainedInheritanceFixtures():
+    class Base:
+        def method_to_override(self) -> int:
+            return 3
+        def method_to_inherit(self) -> int:
+            return 4
+    class Complication(Base):
+        def method_to_inherit_2(self)->int:
+            return 7
+        def method_to_override(self)->int:
+            return 2
+    class Inheritor(Complication):
+        def method_to_override(self)->int:
+            return 9
+        def __init__(self):
+            pass
+
+class MultipleInheritanceFixtures():
+    class Subbase():
+        def method_to_be_subinherited(self):
+            return 0
+    class Base1(Subbase):
+        def method_to_be_inherited(self):
+            return 4
+        def method_to_override_final(self):
+            return 0
+        def method_to_override_intermediate(self):
+            return 0
+        def method_that_should_not_be_overridden(self):
+            return 1
+    class Base2:
+        def method_to_override_intermediate(self):
+            return 1
+        def method_that_should_not_be_overridden(self):
+            return 0
+        def method_to_be_inherited_2(self):
+            return 4
+    class Inheritor(Base2, Base1):
+        def method_to_override_final(self):
+            return 1
+        def __init__(self):
+            pass
+
+
 class testUtils(unittest.TestCase):
     """Different common test utilities"""
 
-    Differ = difflib.Differ()
     def compare_source(self, source1: str, source2: str):
         """Compare source lines together. Provides some details on what is wrong if error occurs."""
-        differences = list(self.Differ.compare(source1, source2))
-        for i, difference in enumerate(differences):
-            section = source1[min(i-10, 0):max(i+10, len(differences))]
-            verdict = True if difference == " " else False
-            message = "Source code did not match. At char %s. \n: %s" % (i, section)
-            self.assertTrue(verdict, message)
+        if source1 == source2:
+            return
+
+        #Sources are compared line by line, and only the
+        #first differing hunk is reported.
+        lines1 = source1.splitlines(keepends=True)
+        lines2 = source2.splitlines(keepends=True)
+        matcher = difflib.SequenceMatcher(a=lines1, b=lines2, autojunk=True)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            expected = "".join(lines1[i1:i2])
+            found = "".join(lines2[j1:j2])
+            i = sum(len(line) for line in lines1[:i1]) + len(os.path.commonprefix([expected, found]))
+            section = source1[max(0, i-10):min(len(source1), i+10)]
+            message = "Source code did not match. At line %s, char %s. \n: %s\n" % (i1, i, section)
+            message += "Expected: \n%s" % expected
+            message += "Found: \n%s" % found
+            self.fail(message)
     def util_test_issubclass(self, totest: Type, Bases: List[Type]):
         for base in Bases:
-            self.assertTrue(issubclass(totest, base))
+            self.assertTrue(issubclass(totest, base), "%s is not a subclass of %s" % (totest, base))
     def util_test_isinstance(self, totest: Any, Bases: List[Type]):
         """Tests that the test item is a base for all bases"""
         for base in Bases:
-            self.assertTrue(isinstance(totest, base))
+            self.assertIsInstance(totest, base)
 
 
 class testInheritanceStatic(testUtils):
@@ -65,23 +144,15 @@ class testInheritanceStatic(testUtils):
         """Test that static inheritance is properly functioning
             with a single inheritance cycle"""
         #Startpoint
-        class Base:
-            def method_to_override(self) -> int:
-                return 3
-            def method_to_inherit(self) -> int:
-                return 4
-        class Inheritor(Base):
-            def method_to_override(self) -> int:
-                return 6
-            def __init__(self):
-                pass
+        Base = SingleInheritanceFixtures.Base
+        Inheritor = SingleInheritanceFixtures.Inheritor
         Final = run_rewrite(Inheritor)
         self.util_test_issubclass(Final, [Inheritor, Base])
         instance = Final()
         original_instance = Inheritor()
         self.util_test_isinstance(instance, [Inheritor, Base])
-        self.assertTrue(instance.method_to_override() == original_instance.method_to_override())
-        self.assertTrue(instance.method_to_inherit() == original_instance.method_to_inherit())
+        self.assertEqual(instance.method_to_override(), original_instance.method_to_override())
+        self.assertEqual(instance.method_to_inherit(), original_instance.method_to_inherit())
 
     def test_inheritance_chained(self):
         """
@@ -89,21 +160,9 @@ class testInheritanceStatic(testUtils):
         multiple subclasses together. Tests all functions are correctly captured.
         """
         #Startpoint
-        class Base:
-            def method_to_override(self) -> int:
-                return 3
-            def method_to_inherit(self) -> int:
-                return 4
-        class Complication(Base):
-            def method_to_inherit_2(self)->int:
-                return 7
-            def method_to_override(self)->int:
-                return 2
-        class Inheritor(Complication):
-            def method_to_override(self)->int:
-                return 9
-            def __init__(self):
-                pass
+        Base = ChainedInheritanceFixtures.Base
+        Complication = ChainedInheritanceFixtures.Complication
+        Inheritor = ChainedInheritanceFixtures.Inheritor
 
         #Test OOP
         Final = run_rewrite(Inheritor)
@@ -114,9 +173,9 @@ class testInheritanceStatic(testUtils):
 
         #Test logic
 
-        self.assertTrue(instance.method_to_override() == original_instance.method_to_override())
-        self.assertTrue(instance.method_to_inherit() == original_instance.method_to_inherit())
-        self.assertTrue(instance.method_to_inherit_2() == original_instance.method_to_inherit_2())
+        self.assertEqual(instance.method_to_override(), original_instance.method_to_override())
+        self.assertEqual(instance.method_to_inherit(), original_instance.method_to_inherit())
+        self.assertEqual(instance.method_to_inherit_2(), original_instance.method_to_inherit_2())
 
     def test_inheritance_multiple(self):
         """
@@ -127,34 +186,11 @@ class testInheritanceStatic(testUtils):
 
         The hardest test in this suite
         """
-        class Subbase():
-            def method_to_be_subinherited(self):
-                return 0
-
         #Starting state
-        class Base1(Subbase):
-            def method_to_be_inherited(self):
-                return 4
-            def method_to_override_final(self):
-                return 0
-            def method_to_override_intermediate(self):
-                return 0
-            def method_that_should_not_be_overridden(self):
-                return 1
-
-        class Base2:
-            def method_to_override_intermediate(self):
-                return 1
-            def method_that_should_not_be_overridden(self):
-                return 0
-            def method_to_be_inherited_2(self):
-                return 4
-
-        class Inheritor(Base2, Base1):
-            def method_to_override_final(self):
-                return 1
-            def __init__(self):
-                pass
+        Subbase = MultipleInheritanceFixtures.Subbase
+        Base1 = MultipleInheritanceFixtures.Base1
+        Base2 = MultipleInheritanceFixtures.Base2
+        Inheritor = MultipleInheritanceFixtures.Inheritor
 
         #Test OOP logic.
         First = run_rewrite(Subbase)
@@ -167,12 +203,12 @@ class testInheritanceStatic(testUtils):
 
         #Test Logic
 
-        self.assertTrue(instance.method_to_override_final() == original_instance.method_to_override_final())
-        self.assertTrue(instance.method_to_override_intermediate() == original_instance.method_to_override_intermediate())
-        self.assertTrue(instance.method_that_should_not_be_overridden() == original_instance.method_that_should_not_be_overridden())
-        self.assertTrue(instance.method_to_be_inherited() == original_instance.method_to_be_inherited())
-        self.assertTrue(instance.method_to_be_inherited_2() == original_instance.method_to_be_inherited_2())
-        self.assertTrue(instance.method_to_be_subinherited() == original_instance.method_to_be_subinherited())
+        self.assertEqual(instance.method_to_override_final(), original_instance.method_to_override_final())
+        self.assertEqual(instance.method_to_override_intermediate(), original_instance.method_to_override_intermediate())
+        self.assertEqual(instance.method_that_should_not_be_overridden(), original_instance.method_that_should_not_be_overridden())
+        self.assertEqual(instance.method_to_be_inherited(), original_instance.method_to_be_inherited())
+        self.assertEqual(instance.method_to_be_inherited_2(), original_instance.method_to_be_inherited_2())
+        self.assertEqual(instance.method_to_be_subinherited(), original_instance.method_to_be_subinherited())
 
 
 class testClassAttributes(testUtils):
@@ -209,9 +245,9 @@ class testClassAttributes(testUtils):
         Final = run_rewrite(ClassAttributesTester)
 
         #Test class level access is functional
-        self.assertTrue(ClassAttributesTester.item == Final.item)
+        self.assertEqual(ClassAttributesTester.item, Final.item)
         Final.append(3)
-        self.assertTrue(ClassAttributesTester.item2[1] == Final.item2[1])
+        self.assertEqual(ClassAttributesTester.item2[1], Final.item2[1])
         self.util_test_issubclass(Final, [ClassAttributesTester, Final])
 
         instance_one_a = Final(3)
@@ -221,7 +257,7 @@ class testClassAttributes(testUtils):
 
         instance_one_a.append(2)
 
-        self.assertTrue(instance_two_a.item2[2] == instance_one_a.item2[2])
+        self.assertEqual(instance_two_a.item2[2], instance_one_a.item2[2])
     def test_class_attribute_inheritance(self):
         """
         Test class attributes function correctly when
@@ -254,7 +290,7 @@ class testClassAttributes(testUtils):
 
         self.util_test_issubclass(Final, [ClassAttributesTester, ClassAttributeBase, Intermediate])
         self.Final.modify_registry(6)
-        self.assertTrue(Final.registry[-1] == Intermediate.registry[-1])
+        self.assertEqual(Final.registry[-1], Intermediate.registry[-1])
 
 
 class testInlineRewriting(testUtils):
@@ -284,7 +320,7 @@ class testInlineRewriting(testUtils):
         internal1 = Wrapper()
         internal2 = internal1()
         item = internal2()
-        self.assertTrue(item == closure)
+        self.assertEqual(item, closure)
     def test_inline_nested_duel(self):
         """Test if a nested sequence of classes and functions will compile and execute correctly"""
         closure = 1
@@ -303,8 +339,8 @@ class testInlineRewriting(testUtils):
         deeper = Wrapper()
         nested = deeper()
         instance = nested(instance_param)
-        self.assertTrue(instance.feature == instance_param)
-        self.assertTrue(instance.param == closure_parem)
+        self.assertEqual(instance.feature, instance_param)
+        self.assertEqual(instance.param, closure_parem)
     def test_pass_by_function(self):
         """
         Tests the ability of the preprocessor to track
@@ -328,12 +364,12 @@ class testInlineRewriting(testUtils):
         c_wrapped = run_rewrite(c)
         process_wrapped = run_rewrite(process)
 
-        self.assertTrue(process_wrapped(a) == 3)
-        self.assertTrue(process_wrapped(a_wrapped)==3)
-        self.assertTrue(process_wrapped(b) == 4)
-        self.assertTrue(process_wrapped(b_wrapped) == 4)
-        self.assertTrue(process_wrapped(c) == "5")
-        self.assertTrue(process_wrapped(c_wrapped) == "5")
+        self.assertEqual(process_wrapped(a), 3)
+        self.assertEqual(process_wrapped(a_wrapped), 3)
+        self.assertEqual(process_wrapped(b), 4)
+        self.assertEqual(process_wrapped(b_wrapped), 4)
+        self.assertEqual(process_wrapped(c), "5")
+        self.assertEqual(process_wrapped(c_wrapped), "5")
 
 class testFunctionRecursiveRewriting(testUtils):
     """
@@ -373,9 +409,9 @@ class testFunctionRecursiveRewriting(testUtils):
         colletz_a_wrapper = run_rewrite(colletz_a)
         colletz_b_wrapper = run_rewrite(colletz_b)
 
-        self.assertTrue(tail_wrapper() == 5)
-        self.assertTrue(colletz_a_wrapper(10) == 1)
-        self.assertTrue(colletz_b_wrapper(10) == 1)
+        self.assertEqual(tail_wrapper(), 5)
+        self.assertEqual(colletz_a_wrapper(10), 1)
+        self.assertEqual(colletz_b_wrapper(10), 1)
     def test_static_nested_definition(self):
         """ Test the ability to properly detect and handle a static nested recursion loop."""
         def colletz(number: int)->int:
@@ -388,4 +424,4 @@ class testFunctionRecursiveRewriting(testUtils):
                     return colletz(3*number + 1)
             return process_number(number)
         colletz_wrapper = run_rewrite(colletz)
-        self.assertTrue(colletz_wrapper(10) == 1)
\ No newline at end of file
+        self.assertEqual(colletz_wrapper(10), 1)
\ No newline at end of file
@@ -18,8 +18,6 @@ from typing import Type
 class Example():
     """
     A base case for an example.
-
-    Tracks subclassed examples for convience
     """
     single_inheritance = False
     multiple_inheritance = False
@@ -33,9 +31,6 @@ class Example():
     class_fields = False
     class_calls = False
 
-    registry = []
-    def __init_subclass__(cls):
-        cls.registry.append(cls)
     def get_original(self)->Type:
         raise NotImplementedError()
     def get_final(self)->Type:
@@ -63,7 +58,7 @@ class SimpleSingleInheritance(Example):
     single_inheritance = True
     instance_calls = True
     def get_original(self) ->Type:
-        class Base()
+        class Base():
             def method_to_override(self)->int:
                 return 3
             def method_to_inherit(self)->int:
@@ -106,4 +101,4 @@ class SimpleInstanceAttribute(Example):
 class SimpleClassAttribute(Example):
     instance_calls = True
     instance_fields = True
-    class_fields = True
\ No newline at end of file
+    class_fields = True
@@ -1,4 +1,24 @@
 import unittest
 from src import basic_preprocessing
 
-#impliment test for basic case. Should produce, compile, class case, instance case, environment wrapper.
\ No newline at end of file
+#impliment test for basic case. Should produce, compile, class case, instance case, environment wrapper.
+
+class test_get_format_names(unittest.TestCase):
+    """Tests the balanced brace scan used to find format names"""
+    def test_names(self):
+        get_format_names = basic_preprocessing.Template.get_format_names
+        self.assertEqual(get_format_names("{a} and {b}"), ["a", "b"])
+        self.assertEqual(get_format_names("{x:{w}} and {y}"), ["x:{w}", "y"])
+    def test_escapes(self):
+        """Doubled braces are literal, as in str.format"""
+        get_format_names = basic_preprocessing.Template.get_format_names
+        self.assertEqual(get_format_names("a }} b"), [])
+        self.assertEqual(get_format_names("{x} }}"), ["x"])
+        self.assertEqual(get_format_names("{{x}}"), [])
+        self.assertEqual(get_format_names("{{{x}}}"), ["x"])
+    def test_unmatched(self):
+        get_format_names = basic_preprocessing.Template.get_format_names
+        self.assertRaises(RuntimeError, get_format_names, "a } b")
+        self.assertRaises(RuntimeError, get_format_names, "{x} }")
+        self.assertRaises(RuntimeError, get_format_names, "{x")
+        self.assertRaises(RuntimeError, get_format_names, "{{ {x")
@@ -2,6 +2,7 @@
 from typing import List, Dict, Tuple
 import unittest
 import inspect
+import itertools
 import ast
 import warnings
 import astunparse
@@ -20,11 +21,9 @@ class test_utility_functions(unittest.TestCase):
             return context
 
         new_tree = builder.rebuild(tree, transform)
-        old_nodes = list(ast.walk(tree))
-        new_nodes = list(ast.walk(tree))
-        self.assertTrue(len(old_nodes)==len(new_nodes))
-        for old, new in zip(old_nodes, new_nodes):
-            self.assertTrue(type(old) == type(new))
+        #A length mismatch shows up as a None against a node
+        for old, new in itertools.zip_longest(ast.walk(tree), ast.walk(new_tree)):
+            self.assertIs(type(old), type(new))
     def test_rebuild_replace(self):
         """test that replacement is meaningful"""
         source = inspect.getsource(test_utility_functions)
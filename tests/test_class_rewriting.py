@@ -1,6 +1,10 @@
 from typing import Type
+import inspect
+import textwrap
 import unittest
 
+import astroid
+
 
 def rewrite(object: Type)->Type:
     pass
@@ -8,6 +12,11 @@ def rewrite(object: Type)->Type:
 def is_same(object_1, object_2):
     pass
 
+def get_source(object: Type)->str:
+    """Gets the normalized source of a class, so two classes can be compared"""
+    source = textwrap.dedent(inspect.getsource(object))
+    return astroid.extract_node(source).as_string()
+
 
 
 
@@ -15,7 +24,8 @@ class Example():
     """
     A base case for an example.
 
-    Tracks subclassed examples for convience
+    Examples are plain fixtures. They are collected
+    into TestRewrites.examples, which runs them all.
     """
     single_inheritance = False
     multiple_inheritance = False
@@ -29,24 +39,13 @@ class Example():
     class_fields = False
     class_calls = False
 
-    registry = []
-
-    def __init_subclass__(cls):
-        cls.registry.append(cls)
-
     def get_original(self) -> Type:
         raise NotImplementedError()
 
     def get_final(self) -> Type:
         raise NotImplementedError()
 
-    def test_run(self):
-        original = self.get_original()
-        predicted = self.get_final()
-        actual = rewrite(original)
-        self.assertTrue(predicted, actual)
-
-class NoopExample(Example, unittest.TestCase):
+class NoopExample(Example):
     """ A noop. Nothing happens."""
 
     def get_original(self) -> Type:
@@ -70,7 +69,7 @@ class testInheritance():
     """
 
 
-class SimpleSingleInheritanceFixtures(Example, unittest.TestCase):
+class SimpleSingleInheritanceFixtures(Example):
     """Test single inheritance with instance calls"""
     single_inheritance = True
     instance_calls = True
@@ -118,4 +117,23 @@ class SimpleInstanceAttribute(Example):
 class SimpleClassAttribute(Example):
     instance_calls = True
     instance_fields = True
-    class_fields = True
\ No newline at end of file
+    class_fields = True
+
+
+class TestRewrites(unittest.TestCase):
+    """
+    Runs every example through the rewriter, one
+    subtest per example.
+    """
+    examples = [
+        NoopExample(),
+        SimpleSingleInheritanceFixtures(),
+        SimpleInstanceAttribute(),
+    ]
+    def test_run(self):
+        for example in self.examples:
+            with self.subTest(type(example).__name__):
+                original = example.get_original()
+                predicted = example.get_final()
+                actual = rewrite(original)
+                self.assertEqual(get_source(predicted), get_source(actual))
@@ -10,11 +10,12 @@ Objectives:
 
 """
 import unittest
-from typing import Generator, List
+from typing import Generator, List, Tuple
 
 import astroid
 import ast
 import inspect
+import textwrap
 
 
 from src import build
@@ -26,18 +27,9 @@ class test_linked_lists(unittest.TestCase):
     """
     def test_firstlast(self):
         """Test the first and last properties are effective"""
-        a = build.DoubleLinkedList()
-        b = build.DoubleLinkedList()
-        c = build.DoubleLinkedList()
-        d = build.DoubleLinkedList()
-
-        a.child = b
-        b.child = c
-        c.child = d
+        a, b, c, d = build.DoubleLinkedList.chain(4)
 
         self.assertTrue(a.first is a)
-        print(b.child)
-        print(a.last is b)
         self.assertTrue(a.last is d)
         self.assertTrue(b.first is a)
         self.assertTrue(b.last is d)
@@ -46,21 +38,8 @@ class test_linked_lists(unittest.TestCase):
 
     def test_insertion(self):
         """ test insertion is working without issue"""
-        a = build.DoubleLinkedList()
-        b = build.DoubleLinkedList()
-        c = build.DoubleLinkedList()
-        d = build.DoubleLinkedList()
-
-        x = build.DoubleLinkedList()
-        y = build.DoubleLinkedList()
-        z = build.DoubleLinkedList()
-
-        a.child = b
-        b.child = c
-        c.child = d
-
-        x.child = y
-        y.child = z
+        a, b, c, d = build.DoubleLinkedList.chain(4)
+        x, y, z = build.DoubleLinkedList.chain(3)
 
         b.insert(x)
         self.assertTrue(b.parent is z)
@@ -92,6 +71,16 @@ class test_linked_lists(unittest.TestCase):
     def test_creation(self):
         build.DoubleLinkedList()
 
+    def test_chain(self):
+        """Test that chain links nodes the same way the setters would"""
+        a, b, c = build.DoubleLinkedList.chain(3)
+        self.assertIs(a.parent, None)
+        self.assertIs(a.child, b)
+        self.assertIs(b.parent, a)
+        self.assertIs(b.child, c)
+        self.assertIs(c.parent, b)
+        self.assertIs(c.child, None)
+
 class testActions(unittest.TestCase):
     def test_creation(self):
         """tests if you can create these at all"""
@@ -103,17 +92,19 @@ class testActions(unittest.TestCase):
         def test_target():
             print("Hello world")
 
-        source = inspect.getsource(test_target)
-        tree = astroid.parse(source)
+        #Only the structure is walked here, no inference is needed,
+        #so the builtin ast parser is used rather than astroid.
+        source = textwrap.dedent(inspect.getsource(test_target))
+        tree = ast.parse(source)
 
         NodeBuilder = build.BuildNode()
-        stack: List[Tuple[Generator[astroid.NodeNG], astroid.NodeNG]] = []
-        generator = tree.get_children()
+        stack: List[Tuple[Generator[ast.AST, None, None], ast.AST]] = []
+        generator = ast.iter_child_nodes(tree)
         while True:
             try:
                 child = next(generator)
                 stack.append((generator, child))
-                generator = child.get_children()
+                generator = ast.iter_child_nodes(child)
             except StopIteration:
 
 
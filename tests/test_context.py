@@ -42,6 +42,16 @@ def source7(item):
     return item
 torch_fail = [source7]
 
+#Source lookups are cached, since every test rebuilds its blocks
+#from the same functions.
+_SRC_CACHE = {}
+def _cached_src(obj):
+    key = id(obj)
+    value = _SRC_CACHE.get(key)
+    if value is None:
+        value = _sources.get_source_lines_and_file(obj)
+        _SRC_CACHE[key] = value
+    return value
 
 
 #Run tests
@@ -53,7 +63,7 @@ class test_Context(unittest.TestCase):
     torch integration tests.
     """
     def create_codeblock(self, obj):
-        sourcelines, lineno, filename = _sources.get_source_lines_and_file(obj)
+        sourcelines, lineno, filename = _cached_src(obj)
         source = "".join(sourcelines)
         context = _sources.SourceContext(source, filename, lineno, 0)
         r = context.make_raw_range(0, 10000)
@@ -7,6 +7,7 @@ code blocks or stubs.
 """
 
 import unittest
+from typing import NamedTuple
 from src import datastructures
 from src import errors
 
@@ -68,11 +69,10 @@ class test_DLList(unittest.TestCase):
 
 
 class unit_CodeBlock(unittest.TestCase):
-    class range_Mockup:
+    class range_Mockup(NamedTuple):
         """A mockup for a sourcerange"""
-        def __init__(self, start, end):
-            self.start = start
-            self.end = end
+        start: int
+        end: int
 
     def test_linked(self):
         """test the ability to link together, and use, lists"""
@@ -111,10 +111,9 @@ class unit_CodeBlock(unittest.TestCase):
         suite += [self.range_Mockup(start+2, end-2) for start, end in zip(startat, endat)]
         expect += [Exception(i) for i in range(3)]
 
-        for r, expectation in zip(suite, expect):
-            err = a.fetch_exception(None, r)
-            self.assertTrue(type(err) == expectation.__class__)
-            self.assertTrue(err.args[0] == expectation.args[0])
+        errs = a.fetch_exceptions_batch(None, suite)
+        self.assertEqual([type(err) for err in errs], [type(expectation) for expectation in expect])
+        self.assertEqual([err.args[0] for err in errs], [expectation.args[0] for expectation in expect])
 
     def test_unlinked(self):
         """Test the ability to use lists at all"""
@@ -134,3 +133,8 @@ class unit_CodeBlock(unittest.TestCase):
         r_false = self.range_Mockup(3000, 30054)
         f_exc = block.fetch_exception(None, r_false)
         self.assertTrue(isinstance(f_exc, errors.UnhandledPreprocessingError))
+
+        #Test batch lookup agrees
+        t_batch, f_batch = block.fetch_exceptions_batch(None, [r_true, r_false])
+        self.assertTrue(isinstance(t_batch, Exception))
+        self.assertTrue(isinstance(f_batch, errors.UnhandledPreprocessingError))
@@ -7,6 +7,10 @@ import unittest
 import torch
 from src import rcb
 
+#The integration tests each define their own func on purpose.
+#torch.jit.script caches the compiled result against the function
+#object, so a shared module level func would be scripted once and
+#the _rcb handed in by any later test would be silently ignored.
 class integration_rcb(unittest.TestCase):
     """
     Tests rcb creation, and proper functionality
@@ -8,10 +8,10 @@ cause various effects.
 
 
 """
+import os
 import unittest
 import difflib
 import textwrap
-import pyparsing as pp
 from src import templates
 
 
@@ -27,18 +27,30 @@ class TestKit(unittest.TestCase):
             lines_a = string1.splitlines()
             lines_b = string2.splitlines()
 
-            message = "Strings not equal. Detailed comparison: \n"
+            message = ["Strings not equal. Detailed comparison: \n"]
             for i, (linea, lineb) in enumerate(zip(lines_a, lines_b)):
-                submessage = "Line No:" +str(i) + "\n"
-                submessage += linea + "\n"
-                submessage += lineb + "\n"
-                differences = difflib.ndiff(linea, lineb)
-                comparison = ""
-                for diff in differences:
-                    comparison += diff[0]
-                submessage += comparison + "\n"
-                message += submessage + "\n"
-            raise AssertionError(message)
+                message.append("Line No:" + str(i) + "\n" + linea + "\n" + lineb + "\n")
+                message.append(self.compare_line(linea, lineb) + "\n\n")
+            raise AssertionError("".join(message))
+    @staticmethod
+    def compare_line(linea: str, lineb: str, limit: int = 200)->str:
+        """
+        Marks where two lines differ, in ndiff style.
+
+        The common head and tail are stripped before diffing, since
+        a character level diff is expensive on long lines. Should the
+        remainder still be longer than limit, it is not diffed.
+        """
+        if linea == lineb:
+            return " " * len(linea)
+        head = len(os.path.commonprefix([linea, lineb]))
+        tail = len(os.path.commonprefix([linea[head:][::-1], lineb[head:][::-1]]))
+        middle_a = linea[head:len(linea) - tail]
+        middle_b = lineb[head:len(lineb) - tail]
+        if max(len(middle_a), len(middle_b)) > limit:
+            return " " * head + "<diff skipped, lines too long>"
+        comparison = "".join(diff[0] for diff in difflib.ndiff(middle_a, middle_b))
+        return " " * head + comparison + " " * tail
 
 
 class test_Alias(TestKit):
@@ -71,6 +83,26 @@ class test_Alias(TestKit):
         expected_string = "item ham item"
         output = alias.substitute(test_string, {"key1": "ham"})
         self.assert_same_strings(output, expected_string)
+    def test_multiple_aliases(self):
+        """Test aliases are found once each in keyword order, and restored in one pass"""
+        keywords = {"key%s" % i : "value%s" % i for i in range(12)}
+        test_context = templates.Context(keywords, {}, "")
+        context, alias = templates.Keyword_Alias.claim_alias(test_context, "TEST")
+        test_string = "<$$TEST11$$> <$$TEST1$$> <$$TEST11$$> <$$TEST12$$> <$$OTHER1$$>"
+        self.assertEqual(["key1", "key11"], alias.find_aliases_in_string(test_string))
+
+        expected_string = "value11 ham value11 <$$TEST12$$> <$$OTHER1$$>"
+        self.assert_same_strings(expected_string, alias.substitute(test_string, {"key1" : "ham"}))
+        expected_string = "value11 value1 value11 <$$TEST12$$> <$$OTHER1$$>"
+        self.assert_same_strings(expected_string, alias.substitute(test_string))
+    def test_compiled_substitution(self):
+        """Test a prepared substitution matches substitute for every set of keywords"""
+        test_context = templates.Context({"key1" : "potato", "key2" : "tomato"}, {}, "")
+        context, alias = templates.Keyword_Alias.claim_alias(test_context, "TEST")
+        test_string = "<$$TEST1$$> and <$$TEST0$$>, <$$TEST5$$> then <$$TEST1$$>."
+        substitute = alias.compile_substitution(test_string)
+        for keywords in (None, {"key1" : "ham"}, {"key1" : "ham", "key2" : "eggs"}):
+            self.assert_same_strings(alias.substitute(test_string, keywords), substitute(keywords))
 
 class unittest_Directive_Base(TestKit):
     """
@@ -88,9 +120,8 @@ class unittest_Directive_Base(TestKit):
         string = "Ignore {catch this} {also_this}"
         expectations = ["catch this", "also_this"]
         pattern = Mockup.get_select_pattern()
-        for match in pattern.scan_string(string):
-            result = match[0]
-            _, content, _ = result
+        for match in pattern.finditer(string):
+            content = match.group(1)
             self.assertTrue(content in expectations)
     def test_pattern_syntax_keywords(self):
         """Test generation and fetching of more complex patterns works"""
@@ -103,9 +134,8 @@ class unittest_Directive_Base(TestKit):
         string = "Ignore <!START|-|This should be captured!> <!This should not be captured!>"
         expectations = ["This should be captured"]
         pattern = Mockup.get_select_pattern()
-        for match in pattern.scan_string(string):
-            result = match[0]
-            _, content, _ = result
+        for match in pattern.finditer(string):
+            content = match.group(1)
             self.assertTrue(content in expectations)
     def test_nested_pattern(self):
         """Test pattern catching works correctly on nested examples"""
@@ -118,12 +148,31 @@ class unittest_Directive_Base(TestKit):
         string = "Ignore <!START|=|<!This should be captured<!deeper!>!> !> <!This should not be captured!>"
         expectations = ["<!This should be captured<!deeper!>!> "]
         pattern = Mockup.get_select_pattern()
-        matches = list(pattern.scan_string(string))
+        matches = list(pattern.finditer(string))
         self.assertTrue(len(expectations) == len(matches))
-        for match in pattern.scan_string(string):
-            result = match[0]
-            _, content, _ = result
+        for match in matches:
+            content = match.group(1)
             self.assertTrue(content in expectations)
+    def test_pattern_cached_per_syntax(self):
+        """Test the select pattern is built once per syntax, and not shared between syntaxes"""
+        class Mockup(templates.Directive):
+            directive_type = "Mockup"
+            select_indicators = ("<!", "!>")
+            token_magic_word = "MOCKUP"
+            subgroup_patterns = (None,)
+        class SameMockup(templates.Directive):
+            directive_type = "SameMockup"
+            select_indicators = ("<!", "!>")
+            token_magic_word = "SAMEMOCKUP"
+            subgroup_patterns = [None]
+        class OtherMockup(Mockup):
+            select_indicators = ("{", "}")
+
+        self.assertIs(Mockup.get_select_pattern(), Mockup.get_select_pattern())
+        self.assertIs(Mockup.get_select_pattern(), SameMockup.get_select_pattern())
+        self.assertIsNot(Mockup.get_select_pattern(), OtherMockup.get_select_pattern())
+        self.assertTrue(OtherMockup.string_has_match("a {b} c"))
+        self.assertFalse(OtherMockup.string_has_match("a <!b!> c"))
     def test_string_has_match(self):
         """Test that has match is functioning correctly."""
         class Mockup(templates.Directive):
@@ -139,6 +188,39 @@ class unittest_Directive_Base(TestKit):
         self.assertTrue(Mockup.string_has_match(string_with_match))
         self.assertTrue(Mockup.string_has_match(string_multi_match))
         self.assertFalse(Mockup.string_has_match(string_no_match))
+    def test_pattern_edge_cases(self):
+        """Test scanner behavior on whitespace, unbalanced nesting, and multiple groups"""
+        class Mockup(templates.Directive):
+            directive_type = "Mockup"
+            select_indicators = ("{", "}")
+            token_magic_word = "MOCKUP"
+            subgroup_patterns = (None,)
+        class MultiMockup(templates.Directive):
+            directive_type = "MultiMockup"
+            select_indicators = ("<!", "!>")
+            token_magic_word = "MULTIMOCKUP"
+            subgroup_patterns = ("START", None, None)
+
+        #Leading whitespace in a group is not captured. Trailing is.
+        match = Mockup.get_select_pattern().search("{  padded }")
+        self.assertEqual("padded ", match.group(1))
+        self.assertEqual((0, 11), match.span())
+
+        #An unbalanced open is skipped over, and the balanced
+        #directive behind it is found
+        match = Mockup.get_select_pattern().search("{a{b}")
+        self.assertEqual("b", match.group(1))
+        self.assertEqual((2, 5), match.span())
+
+        #Empty directives still match
+        self.assertEqual("", Mockup.get_select_pattern().search("{}").group(1))
+
+        #Keywords and delimiters may be surrounded by whitespace, and
+        #nested directives are captured whole.
+        string = "<! START |=| <!a|=|b!> |=| c !>"
+        match = MultiMockup.get_select_pattern().search(string)
+        self.assertEqual(("<!a|=|b!> ", "c "), match.groups()[:-1])
+        self.assertFalse(MultiMockup.string_has_match("<!STOP|=|a|=|b!>"))
     def test_get_directives(self):
         """Test the ability of the parser to get directive instances given targets"""
         class Mockup(templates.Directive):
@@ -188,6 +270,14 @@ class unittest_Directive_Subclasses(TestKit):
         def tester():
             output_string, formatting_dict = templates.Lookup.compile_directives(context, test_raise, parser_mockup)
         self.assertRaises(templates.TemplateKeyNotFound, tester)
+    def test_lookup_cyclic(self):
+        """Test that a subtemplate which looks itself back up is reported instead of recursing forever"""
+        test_string = "{first}"
+        subtemplates = {"first" : "a {second}", "second" : "b {first}"}
+        context = templates.Context({}, subtemplates, test_string)
+        def tester():
+            templates.Resolver.parse(context, test_string)
+        self.assertRaises(templates.SubtemplateCompileFailure, tester)
     def test_escape(self):
         """Tests the escape template ability"""
         def parser_mockup(context, string):
@@ -268,6 +358,13 @@ class unittest_Parser(TestKit):
     """
     Test the parser and formatting functions
     """
+    def test_format(self):
+        """Test formatting replaces every key in one pass, preferring longer keys"""
+        formatting = {"<#A1#>" : "one", "<#A1#>0" : "ten", "<#B#>" : "<#A1#>"}
+        string = "<#A1#> <#A1#>0 <#B#> none"
+        expected = "one ten <#A1#> none"
+        self.assert_same_strings(expected, templates.Resolver.format(formatting, string))
+        self.assert_same_strings(string, templates.Resolver.format({}, string))
     def test_parse(self):
         test_string = textwrap.dedent("""
         this is a {keyword}
@@ -334,4 +431,24 @@ class integration_test_Template(TestKit):
         keywords = {"keyword" : "apple", "keyword2" : "grape"}
         keywords["items"] = ["A", "B", "C"]
         output = instance(keywords)
-        self.assert_same_strings(output, expectations)
\ No newline at end of file
+        self.assert_same_strings(output, expectations)
+    def test_specialized_template(self):
+        """Test that keyword only templates are specialized, and render the same as the resolver"""
+        class mockup_template(templates.Template):
+            primary = "A {keyword} and a {keyword2}\n with 'quotes' and \\ slashes"
+            multifill = "<!!MULTIFILL|=|, |=|{items}!!>"
+            nested = "A lookup of {primary}"
+
+        keywords = {"keyword" : "apple", "keyword2" : "grape", "items" : ["A", "B"]}
+        expectations = "A apple and a grape\n with 'quotes' and \\ slashes"
+        self.assertIsNotNone(mockup_template.specialize("primary"))
+        self.assertIsNone(mockup_template.specialize("multifill"))
+        self.assertIsNone(mockup_template.specialize("nested"))
+        self.assert_same_strings(mockup_template("primary")(keywords), expectations)
+        self.assert_same_strings(mockup_template("nested")(keywords), "A lookup of " + expectations)
+        self.assertRaises(templates.TemplateKeyNotFound, lambda : mockup_template("primary")({}))
+
+        #The specialized renderer declines keywords it cannot join, rather than raising.
+        renderer = mockup_template.specialize("primary")
+        self.assertIsNone(renderer({"keyword" : "apple"}))
+        self.assertIsNone(renderer({"keyword" : "apple", "keyword2" : 3}))
@@ -0,0 +1,82 @@
+"""
+
+Tests for the transform processor, and the
+transforms which run under it.
+
+"""
+import textwrap
+import unittest
+
+import astroid
+
+from transforms.utilities import Processor, Transform
+from transforms.inline_function import Inline_Function
+
+
+class integration_Processor(unittest.TestCase):
+    """
+    Tests that the processor walks the whole tree
+    across edits, and hands back the edited tree.
+    """
+    def test_nested_functions(self):
+        source = """\
+        def outer():
+            x = 1
+            def inner1():
+                return x
+            def inner2():
+                return x
+            return inner1() + inner2()
+        """
+        module = astroid.parse(textwrap.dedent(source))
+        original = module.as_string()
+
+        root, modified = Processor([Inline_Function()])(module)
+
+        self.assertTrue(modified)
+        names = [item.name for item in root.body]
+        self.assertEqual(names, ["PROXY__outer_inner1", "PROXY__outer_inner2", "outer"])
+
+        #The tree handed in is left as it was.
+        self.assertEqual(module.as_string(), original)
+        self.assertIs(module.body[0].parent, module)
+    def test_deeply_nested_functions(self):
+        source = """\
+        def outer():
+            x = 1
+            def mid():
+                y = 2
+                def inner():
+                    return y
+                return inner()
+            return mid()
+        """
+        module = astroid.parse(textwrap.dedent(source))
+
+        root, modified = Processor([Inline_Function()])(module)
+
+        #The proxy for mid still holds inner, so the walk must
+        #descend into the proxy to inline it.
+        self.assertTrue(modified)
+        names = [item.name for item in root.body]
+        self.assertEqual(names, ["PROXY__PROXY__outer_mid___call___inner", "PROXY__outer_mid", "outer"])
+
+
+class unittest_Transform(unittest.TestCase):
+    """
+    Tests the editing helpers on Transform.
+    """
+    def test_insert_sibling_behind(self):
+        module = astroid.parse("a = 1\nb = 2\nc = 3\n")
+        original = module.as_string()
+        inserted_source = astroid.extract_node("z = 0")
+        for spaces, expected in ((0, ["z", "b", "c"]), (1, ["b", "z", "c"])):
+            with self.subTest(spaces=spaces):
+                node, inserted = Transform.insert_sibling_behind(module.body[1], [inserted_source], spaces)
+                root = inserted.root()
+                self.assertIs(node.root(), root)
+                self.assertEqual(node.as_string(), "b = 2")
+                self.assertEqual(inserted.as_string(), "z = 0")
+                names = [item.targets[0].name for item in root.body[1:]]
+                self.assertEqual(names, expected)
+                self.assertEqual(module.as_string(), original)
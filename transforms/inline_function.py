@@ -19,6 +19,8 @@ class Inline_Function(Transform):
     go ahead and return the node
     """
 
+    handles = (astroid.FunctionDef,)
+
     #Define class template. This will be filled in to make a proxy
     class_template = """ 
 class PROXY_{name}():
@@ -44,16 +46,33 @@ class PROXY_{name}():
     call_source_template = "{name} \n\t\t"
     function_source_template = "{name} \n\t\t"
 
+    #Characters in a qualified name which cannot appear in an identifier
+    name_translation = str.maketrans({".": "_", "<": "_", ">": "_", " ": "_"})
+
     #Define the environment extractor.
     @classmethod
     def extract_environmental_args(cls, node, root):
+        """
+        Finds the names used under node which are defined outside of root.
+
+        Each name is emitted, and inferred, once. Nodes are visited
+        in source order.
+
+        :param node: The node to search under
+        :param root: The node marking the edge of the local environment
+        :return: A list of (name, type) pairs
+        """
+        seen = set()
         output = []
         lambda_count = 0
-        children = node.get_children()
-        for child in children:
+        #Children are pushed reversed, so they pop in order.
+        stack = list(node.get_children())
+        stack.reverse()
+        while stack:
+            child = stack.pop()
             if isinstance(child, astroid.Lambda):
                 continue
-            if isinstance(child, astroid.Name):
+            if isinstance(child, astroid.Name) and child.name not in seen:
                 source = child.inferred()
                 assert len(source) == 1
                 source = source[0]
@@ -62,12 +81,17 @@ class PROXY_{name}():
                         name = "lambda_" + str(lambda_count)
                         lambda_count += 1
                         output.append((name, 'Callable'))
+                        seen.add(child.name)
                     if source.is_function:
                         output.append((child.name, 'Callable'))
+                        seen.add(child.name)
                     if isinstance(source, astroid.Const):
                         output.append((child.name, source.pytype()))
+                        seen.add(child.name)
             if not isinstance(child, astroid.Arguments):
-                output = output + cls.extract_environmental_args(child, root)
+                children = list(child.get_children())
+                children.reverse()
+                stack.extend(children)
         return output
 
     def __init__(self):
@@ -84,15 +108,15 @@ class PROXY_{name}():
         environmental = self.extract_environmental_args(node, node)
 
         # Construct init parameter, load, and save code snippets.
+        #
+        # Each snippet is joined once, rather than grown per item.
 
-        init_code = ""
-        init_parameters = ""
-        call_load = ""
-        for item in environmental:
-            name, typing = item
-            init_parameters = init_parameters + self.init_parameters_template.format(name=name, type=typing)
-            init_code = init_code + self.init_code_template.format(name=name)
-            call_load = call_load + self.call_load_template.format(name=name)
+        init_parameters_format = self.init_parameters_template.format
+        init_code_format = self.init_code_template.format
+        call_load_format = self.call_load_template.format
+        init_parameters = "".join(init_parameters_format(name=name, type=typing) for name, typing in environmental)
+        init_code = "".join(init_code_format(name=name) for name, _ in environmental)
+        call_load = "".join(call_load_format(name=name) for name, _ in environmental)
 
          # Construct the call arguments
         call_args = node.args.format_args()
@@ -101,25 +125,17 @@ class PROXY_{name}():
             call_args = [self.call_args_template.format(name=item) for item in call_args]
             call_args = "".join(call_args)
 
-        # Construct the function internals source. Do this
-        # by transfering these parts of the tree onto a
-        # virtual module, then turning it back into source
-
-        source_extractor = astroid.Module("extractor")
-        transplant = node.body
-        while len(transplant) > 0:
-            item = transplant.pop(0)
-            item.parent = source_extractor
-            source_extractor.body.append(item)
-        call_source = source_extractor.as_string()
-        call_source = call_source.split('\n')
-        call_source = [self.call_source_template.format(name=item) for item in call_source]
-        call_source = "".join(call_source)
+        # Construct the function internals source. Each
+        # statement of the body is turned back into source
+        # where it stands, and the lines joined.
+
+        call_source = "\n".join(item.as_string() for item in node.body)
+        call_source_format = self.call_source_template.format
+        call_source = "".join(call_source_format(name=item) for item in call_source.split('\n'))
 
         # Tidy up the name, then create the source class.
 
-        name = node.qname()
-        name = name.replace(".", "_")
+        name = node.qname().translate(self.name_translation)
 
         # Create the class source tree, and then insert it into the tree.
 
@@ -3,10 +3,7 @@ from __future__ import annotations
 import copy
 
 import astroid
-from typing import List, Tuple, Optional
-from torch.jit.frontend import UnsupportedNodeError
-from torch.jit.frontend import make_source_context
-#Make source context(source, filename, file_lineno, leading_whitespace_len, uses_true_division, funcname)
+from typing import Dict, List, Tuple, Optional
 
 class Transform():
     """
@@ -22,7 +19,21 @@ class Transform():
     node, or a new node. The second is a bool. It should be true
     if the tree was modified, and false otherwise.
 
+    A transform may set handles to the node classes it acts on.
+    It will then only be called on instances of those classes.
+    Left as None, it is called on every node.
+
+    The editing helpers never modify a tree in place. Each edit
+    copies the whole tree and changes the copy, so no parent
+    pointer of the old tree is rewritten, and every parent
+    pointer of the new tree stays within it. Continue from the
+    node a helper returns, as the old tree no longer holds the
+    edit.
+
     """
+    #No per instance state. Subclasses may still add their own.
+    __slots__ = ()
+    handles: Optional[Tuple[type, ...]] = None
     def get_ancestor_from_top(self, node: astroid.NodeNG, depth: int) -> Optional[astroid.NodeNG]:
         """
 
@@ -36,11 +47,136 @@ class Transform():
         :return: The Nth ancestor, or None if not available
         """
 
-        ancestors = list(node.node_ancestors())
-        ancestors.reverse()
-        if len(ancestors) < depth:
+        #Count the ancestors, then walk back up to the one
+        #depth below the root. Parent pointers only, so nothing
+        #is allocated along the way.
+        count = 0
+        parent = node.parent
+        while parent is not None:
+            count += 1
+            parent = parent.parent
+        if count <= depth:
             return None
-        return ancestors[depth]
+        for _ in range(count - depth):
+            node = node.parent
+        return node
+
+    @staticmethod
+    def replace_child(parent: astroid.NodeNG, child: astroid.NodeNG, replacement: astroid.NodeNG):
+        """
+        Puts replacement in the place child occupies
+        among the fields of parent. Modifies parent.
+
+        :param parent: The node holding child
+        :param child: The child to replace
+        :param replacement: The node to put in its place
+        :raise: ValueError, if child is not found on parent
+        """
+        for field in parent._astroid_fields:
+            value = getattr(parent, field)
+            if value is child:
+                setattr(parent, field, replacement)
+                return
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    if item is child:
+                        value[i] = replacement
+                        return
+        raise ValueError("Node is not a child of the given parent")
+
+    @staticmethod
+    def clone_tree(node: astroid.NodeNG, copies: Optional[Dict[int, astroid.NodeNG]] = None) -> astroid.NodeNG:
+        """
+        Copies node and everything below it, but never
+        anything above it. This replaces copy.deepcopy, which
+        follows the parent pointer and copies the whole tree.
+
+        Child fields are copied, and other attributes shared,
+        except where they refer to a copied node. Scope
+        locals are remapped onto the copies. The copy has
+        no parent.
+
+        :param node: The root of the subtree to copy
+        :param copies: If given, filled with the copy of each node, by id of the original
+        :return: The copy
+        """
+        if copies is None:
+            copies = {}
+        def clone(value):
+            if isinstance(value, astroid.NodeNG):
+                duplicate = copy.copy(value)
+                copies[id(value)] = duplicate
+                for field in value._astroid_fields:
+                    setattr(duplicate, field, clone(getattr(value, field)))
+                for child in duplicate.get_children():
+                    child.parent = duplicate
+                return duplicate
+            if isinstance(value, list):
+                return [clone(item) for item in value]
+            if isinstance(value, tuple):
+                return tuple(clone(item) for item in value)
+            return value
+        duplicate = clone(node)
+        duplicate.parent = None
+
+        #Fix up references held outside the child fields.
+        for item in copies.values():
+            doc_node = getattr(item, "doc_node", None)
+            if doc_node is not None:
+                item.doc_node = copy.copy(doc_node)
+                item.doc_node.parent = item
+            if hasattr(item, "locals"):
+                local_names = {name : [copies.get(id(entry), entry) for entry in entries]
+                               for name, entries in item.locals.items()}
+                if getattr(item, "globals", None) is item.locals:
+                    item.globals = local_names
+                item.locals = local_names
+            if hasattr(item, "instance_attrs"):
+                item.instance_attrs = {name : [copies.get(id(entry), entry) for entry in entries]
+                                       for name, entries in item.instance_attrs.items()}
+        return duplicate
+
+    @staticmethod
+    def copy_whole_tree(node: astroid.NodeNG) -> Tuple[astroid.NodeNG, astroid.NodeNG]:
+        """
+        Copies the whole tree node belongs to, from the root
+        down, leaving the original untouched.
+
+        Nothing is shared between the trees. A shared subtree
+        could only have one parent, so either the old tree
+        would be rewired or the new one would point back into
+        the old one, and transforms navigate by parent.
+
+        :param node: The node which will be edited
+        :return: The copy of node, and the root of the new tree
+        """
+        copies = {}
+        root = Transform.clone_tree(node.root(), copies)
+        return copies[id(node)], root
+
+    @staticmethod
+    def _locate_in_parent(node: astroid.NodeNG) -> Tuple[astroid.NodeNG, int]:
+        """
+        Finds the code block holding node, and where
+        node sits in it. No modifications.
+
+        The index also holds in a copy of the parent, as
+        copy_whole_tree keeps the order of the body.
+
+        :param node: The node to locate
+        :return: The parent, and the index of node in its body
+        :raise: AssertionError, if the parent node is not a code block.
+        :raise: ValueError, if node is not in the body of its parent.
+        """
+        parent = node.parent
+        body = getattr(parent, "body", None)
+        assert isinstance(body, list), "Cannot edit around a node which is not in a code block"
+        #list.index checks identity before equality, in C, and
+        #nodes do not define equality, so this is an identity scan.
+        try:
+            return parent, body.index(node)
+        except ValueError:
+            raise ValueError("Node is not in the body of its parent") from None
 
     @staticmethod
     def insert_sibling_in_front(
@@ -55,7 +191,8 @@ class Transform():
         of the current parent node.
 
         A new tree is built by this method, and the return is the
-        last node examined, and the root of the new tree.
+        last node examined, and the root of the new tree. The old
+        tree is left untouched; see copy_whole_tree.
 
         :param node: The node to insert in front of
         :param to_insert: A list of nodes to insert
@@ -64,19 +201,11 @@ class Transform():
         :raise: AssertionError, if the parent node is not a code block.
         """
 
-        assert hasattr(node.parent, 'body'), "Cannot insert if prior node is not a code block"
-        node = copy.deepcopy(node)
-        to_insert = copy.deepcopy(to_insert)
-
-        parent = node.parent
-        for item in to_insert:
-            item.parent = parent
-
-        insertion_point = parent.body.index(node)
+        parent, insertion_point = Transform._locate_in_parent(node)
         insertion_point -= spaces
         assert insertion_point >= 0, "Attempted to insert sibling before start of list."
-        parent.body = parent.body[:insertion_point] + to_insert + parent.body[insertion_point:]
-        return to_insert[0]
+        parent = Transform.batch_edit(parent, [("insert_before", insertion_point, to_insert)])
+        return parent.body[insertion_point]
 
     @staticmethod
     def insert_sibling_behind(node: astroid.NodeNG,
@@ -86,29 +215,28 @@ class Transform():
         """
 
         This function will go to the parent code block, then
-        A new tree is built by this method, and the return is the
-        last node examined, and the root of the new tree.
+        insert the to_insert nodes at the position "spaces"
+        past node. At 0 they go where node is, pushing node
+        along behind them.
 
-        :param node: The node to insert in front of
+        A new tree is built by this method, and the return is
+        node and the first inserted node, both in the new tree.
+        The old tree is left untouched; see copy_whole_tree.
+
+        :param node: The node to insert relative to
         :param to_insert: A list of nodes to insert
-        :param spaces: How many spaces in front to begin the insertion. 0 is right in front.
-        :return: The node, and the first inserted node.
+        :param spaces: How many places past node to begin the insertion. 0 is at node.
+        :return: The node, and the first inserted node, both in the new tree.
         :raise: AssertionError, if the parent node is not a code block.
         """
 
-        assert hasattr(node.parent, 'body')
-        node = copy.deepcopy(node)
-        to_insert = copy.deepcopy(to_insert)
-
-        parent = node.parent
-        for item in to_insert:
-            item.parent = parent
-
-        insertion_point = parent.body.index(node)
-        insertion_point += spaces
+        parent, index = Transform._locate_in_parent(node)
+        insertion_point = index + spaces
         assert insertion_point < len(parent.body), "Attempted to insert sibling after end of list"
-        parent.body = parent.body[:insertion_point] + to_insert + parent.body[insertion_point:]
-        return node, to_insert[0]
+        parent = Transform.batch_edit(parent, [("insert_before", insertion_point, to_insert)])
+        if insertion_point == index:
+            index += len(to_insert)
+        return parent.body[index], parent.body[insertion_point]
     def replace_node(self,
                      node: astroid.NodeNG,
                      replacement: astroid.NodeNG) -> astroid.NodeNG:
@@ -117,22 +245,70 @@ class Transform():
         replacement node, while keeping everything
         decoupled.
 
-        Return the replacement node, in a new tree.
+        Return the replacement node, in a new tree. The old
+        tree is left untouched; see copy_whole_tree.
 
 
         :param node: The node to replace
         :param replacement: The replacement node.
         :return: The replacement node, in the new tree, and the new tree.
         """
-        assert hasattr(node.parent, 'body'), "Cannot replace a node not right below a code block"
-        node = copy.deepcopy(node)
-        replacement = copy.deepcopy(replacement)
-        nodepoint = node.parent.body.index(node)
+        parent, nodepoint = self._locate_in_parent(node)
+        parent = self.batch_edit(parent, [("replace", nodepoint, [replacement])])
+        return parent.body[nodepoint]
 
-        parent = node.parent
-        replacement.parent = parent
-        parent.body[nodepoint] = replacement
-        return replacement
+    #Where each kind of edit splices, relative to its index, and the
+    #order edits sharing an index are applied in. Later first.
+    _edit_kinds = {"insert_after" : (1, 2), "replace" : (0, 1), "insert_before" : (0, 0)}
+    @staticmethod
+    def batch_edit(parent: astroid.NodeNG,
+                   edits: List[Tuple[str, int, List[astroid.NodeNG]]]) -> astroid.NodeNG:
+        """
+        Applies several edits to the body of one code block,
+        copying the tree only once.
+
+        Each edit is a tuple of kind, index, and payload. Kind
+        is one of "insert_before", "insert_after", or "replace".
+        Index is the position in the body as it is now, before
+        any of the edits. The payload is a list of nodes, which
+        are cloned. A replace swaps the node at index for the
+        whole payload, so one statement may become several.
+
+        A new tree is built by this method, and the old one is
+        left untouched; see copy_whole_tree.
+
+        :param parent: The code block to edit
+        :param edits: The edits to apply
+        :return: The parent, in the new tree
+        :raise: AssertionError, if parent is not a code block
+        :raise: ValueError, if an edit is malformed, or two edits replace the same node
+        """
+        assert isinstance(getattr(parent, "body", None), list), "Cannot edit a node which is not a code block"
+        length = len(parent.body)
+        replaced = set()
+        for kind, index, _ in edits:
+            if kind not in Transform._edit_kinds:
+                raise ValueError("Unknown edit kind: %s" % kind)
+            if not 0 <= index < length:
+                raise ValueError("Edit index %s is outside the body" % index)
+            if kind == "replace":
+                if index in replaced:
+                    raise ValueError("Node at index %s is replaced twice" % index)
+                replaced.add(index)
+
+        # Edits are applied from the end of the body backwards,
+        # so splicing one never moves where the next one lands.
+        # Nothing is copied until every edit has been checked.
+        ordered = sorted(edits, key=lambda edit: (edit[1], Transform._edit_kinds[edit[0]][1]), reverse=True)
+        parent, _ = Transform.copy_whole_tree(parent)
+        for kind, index, payload in ordered:
+            payload = [Transform.clone_tree(item) for item in payload]
+            for item in payload:
+                item.parent = parent
+            start = index + Transform._edit_kinds[kind][0]
+            stop = index + 1 if kind == "replace" else start
+            parent.body[start:stop] = payload
+        return parent
 
 
     def __init__(self):
@@ -148,58 +324,185 @@ class Processor():
     the internal transforms are called, one at
     a time. Each transform should return a node.
 
-    Should the output node be the same object as
-    the input node, the processor goes onto the
-    next transform. Otherwise, it restarts the
-    transform stack on top of the new node.
+    Should a transform modify the tree, the processor
+    walks the node the transform returned, then carries
+    on in the new tree from just past the node the
+    transform acted on. Otherwise, it goes onto the
+    next transform.
 
     If it should be the case that all transforms are
-    exhausted, we get the next sibling to the
-    given node. If it is the case that all such
-    nodes are exhausted, we return the final node.
+    exhausted, we get the next node in the walk. If it
+    is the case that all such nodes are exhausted, we
+    return the root of the final tree.
     """
+    __slots__ = ("transforms", "_dispatch", "debug")
 
-
-
-    def apply_transforms(self, node: astroid.NodeNG):
+    def apply_transforms(self, node: astroid.NodeNG) -> Tuple[astroid.NodeNG, bool]:
         """
         Applies transforms until either
         a modification occurs, in which case
         we break and indicate, or until all
         transforms are exhausted.
 
-        :param node:
-        :return:
+        :param node: The node to apply the transforms to
+        :return: The node to continue from, and whether the tree was modified
         """
 
+        node_type = type(node)
+        transforms = self._dispatch.get(node_type)
+        if transforms is None:
+            #Gather, in order, the transforms which act on this
+            #kind of node. Done once per node class.
+            transforms = tuple(transform for transform in self.transforms
+                               if transform.handles is None or issubclass(node_type, transform.handles))
+            self._dispatch[node_type] = transforms
+        if not transforms:
+            #Most nodes are of a kind nothing acts on.
+            return node, False
         modified = False
-        for transform in self.transforms:
+        for transform in transforms:
             node, modified = transform(node, self)
             if modified:
                 break
         return node, modified
 
 
-    def __init__(self, transforms: List[Transform]):
-        self.transforms = transforms
-    def __call__(self, node: astroid.NodeNG):
+    def __init__(self, transforms: List[Transform], debug: bool = False):
+        #Held as a tuple. The transforms are fixed once processing starts.
+        self.transforms: Tuple[Transform, ...] = tuple(transforms)
+        self._dispatch: Dict[type, Tuple[Transform, ...]] = {}
+        #When set, each node is printed as source once its walk finishes.
+        self.debug = debug
+    @staticmethod
+    def _landing(update: astroid.NodeNG) -> Tuple[astroid.NodeNG, List[int]]:
+        """
+        Finds where a node sits in its tree.
+
+        :param update: The node to locate
+        :return: The root of its tree, and its child indices from that root
+        """
+        landed = []
+        root = update
+        while root.parent is not None:
+            landed.append(tuple(root.parent.get_children()).index(root))
+            root = root.parent
+        landed.reverse()
+        return root, landed
+
+    @staticmethod
+    def _resume(stack: List[list], root: astroid.NodeNG, landed: List[int]) -> List[list]:
+        """
+        Rebuilds a walk stack in the tree root belongs
+        to, after a transform edited the tree.
+
+        The walk keeps its place. Edits only splice the
+        children of one node, the parent of the node the
+        transform returned. Should that node lie on the walk,
+        positions behind the splice are shifted by the number
+        of children it added or removed.
+
+        :param stack: The walk stack, in the old tree
+        :param root: The root of the new tree
+        :param landed: Where the returned node sits, from root
+        :return: The walk stack, in the new tree
+        """
+        depth = len(landed) - 1
+
+        #Every frame has stepped past the child it is working on.
+        position = [frame[2] - 1 for frame in stack]
+
+        resumed = []
+        node = root
+        for level, index in enumerate(position):
+            children = tuple(node.get_children())
+            stop = stack[level][3]
+            if level == depth and landed[:depth] == position[:depth]:
+                delta = len(children) - len(stack[level][1])
+                if landed[depth] <= index:
+                    index += delta
+                if stop is not None and landed[depth] < stop:
+                    stop += delta
+            if not 0 <= index < len(children):
+                #The node being worked in was edited away.
+                resumed.append([node, children, min(max(index + 1, 0), len(children)), stop])
+                break
+            resumed.append([node, children, index + 1, stop])
+            node = children[index]
+        return resumed
+
+    @staticmethod
+    def _walk_into(root: astroid.NodeNG, landed: List[int]) -> List[list]:
+        """
+        Builds a walk stack which visits the node at
+        landed, and everything below it, then ends.
+
+        :param root: The root of the tree
+        :param landed: Where the node sits, from root
+        :return: The walk stack
+        """
+        stack = []
+        node = root
+        for index in landed:
+            children = tuple(node.get_children())
+            stack.append([node, children, index + 1, None])
+            node = children[index]
+        stack[-1][2] = landed[-1]
+        stack[-1][3] = landed[-1] + 1
+        return stack
+
+    def __call__(self, node: astroid.NodeNG) -> Tuple[astroid.NodeNG, bool]:
         """
         :param node: The node to begin processing on, working our way down the page.
-        :return: The root of the last node.
+        :return: The root of the processed tree, and whether it was modified.
         """
-        # Setup  the counters
+        # The walk is depth first, using an explicit stack rather
+        # than recursion. Each frame holds a node, its children,
+        # the index of the next child, and the index to stop at,
+        # None meaning the end. Transforms are applied to a child
+        # before descending into it.
+        #
+        # Edits build a new tree. Should a transform make one, the
+        # stack is rebuilt in the new tree, and set aside. A walk
+        # of just the node the transform returned is run first,
+        # ending once that node is done. The set aside walk then
+        # carries on, just past the node acted upon. Walks set
+        # aside are kept in step with every later edit.
+        #
+        # The floor of a walk is the height its stack must stay
+        # at or above. Dropping below it ends the walk.
+        apply_transforms = self.apply_transforms
+        debug = self.debug
+        edited = False
+        stack = [[node, tuple(node.get_children()), 0, None]]
+        floor = 0
+        waiting = []
         while True:
-            modified = False
-            child_counter = 0
-            while child_counter < len(list(node.get_children())):
-                update, modified = self.apply_transforms(child)
-                if modified:
-                    node = update
-                    break
-                update, modified = self(child)
-                if modified:
-                    node = update
-                    break
-            if not modified:
-                print(node.as_string())
-                return node, False
+            frame = stack[-1]
+            current, children, child_counter, stop = frame
+            if child_counter == (len(children) if stop is None else stop):
+                stack.pop()
+                if debug:
+                    print(current.as_string())
+                if len(stack) < floor:
+                    stack, floor = waiting.pop()
+                    continue
+                if len(stack) == 0:
+                    return current, edited
+                continue
+            child = children[child_counter]
+            frame[2] = child_counter + 1
+            update, modified = apply_transforms(child)
+            if modified:
+                edited = True
+                root, landed = self._landing(update)
+                waiting = [(self._resume(walk, root, landed), walk_floor) for walk, walk_floor in waiting]
+                waiting.append((self._resume(stack, root, landed), floor))
+                if len(landed) == 0:
+                    #The transform returned the root. There is no
+                    #walk of it to run apart from the one set aside.
+                    stack, floor = waiting.pop()
+                    continue
+                stack = self._walk_into(root, landed)
+                floor = len(stack)
+                continue
+            stack.append([child, tuple(child.get_children()), 0, None])